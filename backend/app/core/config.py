@@ -28,6 +28,17 @@ class Settings(BaseSettings):
     # WebSocket Settings
     WEBSOCKET_PING_INTERVAL: int = 20
     WEBSOCKET_PING_TIMEOUT: int = 20
+    WEBSOCKET_MAX_IN_FLIGHT: int = 4  # Requests processed concurrently per connection
+    WEBSOCKET_MAX_PENDING: int = 16  # Requests accepted (running or waiting) per connection
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 64
+    WEBSOCKET_AUDIO_QUEUE_SIZE: int = 64
+    
+    # Intent Fast-Path Settings
+    INTENT_FAST_PATH: bool = True  # Answer common intents locally instead of calling the LLM
+    INTENT_TABLE_PATH: Optional[str] = None  # Defaults to backend/app/services/intents.json
+    INTENT_MATCH_THRESHOLD: float = 0.75  # Minimum share of a phrase a message must cover for a fuzzy match
+    INTENT_MAX_WORDS: int = 6  # Longer messages always go to the LLM
+    INTENT_NEGATIVE_THRESHOLD: float = -0.3  # More negative messages always go to the LLM
     
     # Server Settings
     HOST: str = "0.0.0.0"
@@ -35,6 +46,28 @@ class Settings(BaseSettings):
     
     # Model Settings
     MODEL_NAME: str = "facebook/wav2vec2-base-960h"
+    MODEL_STORE_DIR: Optional[str] = None  # Defaults to backend/app/services/models
+    MODEL_OFFLINE: bool = False  # Require the local model store instead of the hub
+    
+    # ASR Worker Settings
+    ASR_WORKER_ADDRESSES: List[str] = []  # Unix socket paths of dedicated ASR workers, empty runs the model in-process
+    ASR_WORKER_AUTHKEY: Optional[str] = None  # Required shared secret for ASR workers, no default on purpose
+    ASR_RING_SLOTS: int = 8  # Shared memory audio slots per API process
+    ASR_RING_SLOT_SECONDS: int = 30  # Longest utterance a slot can hold
+    ASR_WORKER_TIMEOUT: float = 30.0  # Seconds before an unanswered worker is treated as lost
+    
+    # Inference Optimization Settings
+    SPEECH_MODEL_OPTIMIZATION: str = "none"  # "none", "compile" or "torchscript"
+    # Seconds of 16kHz audio. Inputs are zero-padded to the next bucket without an
+    # attention mask, which slightly changes the transcription versus eager mode;
+    # finer buckets mean less padding but more compiled graphs.
+    SPEECH_MODEL_LENGTH_BUCKETS: List[float] = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 15.0]
+    SPEECH_MODEL_WARMUP: bool = True
+    SPEECH_INFERENCE_THREADS: int = 1  # Concurrent in-process transcriptions
+    
+    # Speculative Pipeline Settings
+    SPECULATIVE_PARTIAL_INTERVAL: float = 0.5  # Seconds of new audio between partial transcripts
+    SPECULATIVE_STABLE_INTERVAL: float = 0.6  # Seconds a partial must stay unchanged before prefetching
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,315 @@
+import asyncio
+import itertools
+import logging
+import os
+import socket
+import stat
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Set, Tuple
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 16kHz, 16-bit mono PCM
+BYTES_PER_SECOND = 16000 * 2
+
+# Reconnect backoff for unreachable workers, in seconds
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+def _authkey() -> bytes:
+    """
+    Return the shared worker key. multiprocessing connections unpickle what
+    they receive, so there is deliberately no default key.
+    """
+    if not settings.ASR_WORKER_AUTHKEY:
+        raise RuntimeError("ASR_WORKER_AUTHKEY must be set to use ASR workers")
+    return settings.ASR_WORKER_AUTHKEY.encode()
+
+class SharedAudioRing:
+    """
+    Fixed-size audio slots in a shared memory segment. The API process owns
+    the segment and cycles through the slots; ASR workers attach to it by
+    name and read audio in place, so only slot numbers cross the control
+    channel instead of pickled arrays.
+    """
+
+    def __init__(self, shm: SharedMemory, slot_size: int):
+        self.shm = shm
+        self.slot_size = slot_size
+        self.slots = shm.size // slot_size
+
+    @classmethod
+    def create(cls, slots: int, slot_size: int) -> "SharedAudioRing":
+        return cls(SharedMemory(create=True, size=slots * slot_size), slot_size)
+
+    @classmethod
+    def attach(cls, name: str, slot_size: int) -> "SharedAudioRing":
+        shm = SharedMemory(name=name)
+        # The owner unlinks the segment; keep the worker's resource tracker from doing it too
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, slot_size)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def write(self, slot: int, data: bytes):
+        offset = slot * self.slot_size
+        self.shm.buf[offset:offset + len(data)] = data
+
+    def read(self, slot: int, nbytes: int) -> bytes:
+        offset = slot * self.slot_size
+        return bytes(self.shm.buf[offset:offset + nbytes])
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+class _WorkerConnection:
+    """Control channel to one ASR worker"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.conn: Optional[Connection] = None
+        self.in_flight: Set[int] = set()
+        self.connecting = False
+        self.retry_at = 0.0
+        self.retry_delay = RECONNECT_MIN_DELAY
+
+    @property
+    def alive(self) -> bool:
+        return self.conn is not None
+
+class ASRWorkerClient:
+    """
+    Sends audio to dedicated ASR worker processes. Audio is written to a
+    shared memory slot and the worker is told which slot to read; the slot
+    is reused once the worker has answered. Requests go to the live worker
+    with the fewest requests in flight.
+    """
+
+    def __init__(self, addresses: List[str]):
+        # Validate the key before allocating shared memory that would otherwise leak
+        _authkey()
+        self.ring = SharedAudioRing.create(
+            settings.ASR_RING_SLOTS,
+            settings.ASR_RING_SLOT_SECONDS * BYTES_PER_SECOND
+        )
+        self.workers = [_WorkerConnection(address) for address in addresses]
+        self._ids = itertools.count()
+        self._pending: Dict[int, Tuple[asyncio.Future, int, _WorkerConnection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._free_slots: Optional[asyncio.Queue] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    def _open(self, address: str) -> Connection:
+        """Blocking connect and handshake with one worker"""
+        conn = Client(address, authkey=_authkey())
+        conn.send(("attach", self.ring.name, self.ring.slot_size))
+        return conn
+
+    async def _connect(self):
+        """Connect to every worker that is down and due for a retry"""
+        now = time.monotonic()
+        due = [
+            worker for worker in self.workers
+            if not worker.alive and not worker.connecting and now >= worker.retry_at
+        ]
+        await asyncio.gather(*(self._connect_worker(worker) for worker in due))
+
+    async def _connect_worker(self, worker: _WorkerConnection):
+        worker.connecting = True
+        try:
+            conn = await self._loop.run_in_executor(None, self._open, worker.address)
+        except Exception as e:
+            logger.warning(
+                f"Could not connect to ASR worker {worker.address}, "
+                f"retrying in {worker.retry_delay:.0f}s: {str(e)}"
+            )
+            worker.retry_at = time.monotonic() + worker.retry_delay
+            worker.retry_delay = min(worker.retry_delay * 2, RECONNECT_MAX_DELAY)
+            return
+        finally:
+            worker.connecting = False
+        
+        worker.conn = conn
+        worker.retry_delay = RECONNECT_MIN_DELAY
+        threading.Thread(target=self._read_loop, args=(worker, conn), daemon=True).start()
+        logger.info(f"Connected to ASR worker {worker.address}")
+
+    def _read_loop(self, worker: _WorkerConnection, conn: Connection):
+        """Forward worker replies to the event loop"""
+        try:
+            while True:
+                kind, request_id, payload = conn.recv()
+                self._loop.call_soon_threadsafe(self._complete, request_id, kind, payload)
+        except (EOFError, OSError):
+            try:
+                self._loop.call_soon_threadsafe(self._worker_lost, worker, conn)
+            except RuntimeError:
+                pass  # Event loop already closed
+        finally:
+            conn.close()
+
+    def _complete(self, request_id: int, kind: str, payload: str):
+        """Resolve a request and return its slot to the ring"""
+        entry = self._pending.pop(request_id, None)
+        if entry is None:
+            return
+        future, slot, worker = entry
+        worker.in_flight.discard(request_id)
+        self._free_slots.put_nowait(slot)
+        
+        if future.done():
+            return  # Cancelled by the caller, only the slot needed freeing
+        if kind == "result":
+            future.set_result(payload)
+        else:
+            future.set_exception(RuntimeError(payload))
+
+    def _worker_lost(self, worker: _WorkerConnection, conn: Optional[Connection]):
+        """Fail the requests of a disconnected worker"""
+        if conn is None or worker.conn is not conn:
+            return  # Already handled, or the worker has reconnected since
+        logger.error(f"Lost connection to ASR worker {worker.address}")
+        worker.conn = None
+        worker.retry_at = time.monotonic() + worker.retry_delay
+        for request_id in list(worker.in_flight):
+            self._complete(request_id, "error", f"ASR worker {worker.address} disconnected")
+
+    def _drop_worker(self, worker: _WorkerConnection):
+        """
+        Treat an unresponsive worker as lost: fail its requests, return their
+        slots and shut the connection down so its reader thread exits.
+        """
+        conn = worker.conn
+        self._worker_lost(worker, conn)
+        if conn is None:
+            return
+        try:
+            # Shutting the socket down wakes the reader blocked in recv(), which
+            # then closes the connection itself
+            sock = socket.socket(fileno=os.dup(conn.fileno()))
+            sock.shutdown(socket.SHUT_RDWR)
+            sock.close()
+        except (OSError, ValueError):
+            conn.close()  # Not a socket, e.g. a named pipe on Windows
+
+    async def _pick_worker(self) -> _WorkerConnection:
+        """Return the live worker with the fewest requests in flight"""
+        # Pick up workers that started late or restarted; only wait when none are up
+        live = [worker for worker in self.workers if worker.alive]
+        if live:
+            if len(live) < len(self.workers) and (self._reconnect_task is None or self._reconnect_task.done()):
+                self._reconnect_task = asyncio.create_task(self._connect())
+        else:
+            await self._connect()
+            live = [worker for worker in self.workers if worker.alive]
+            if not live:
+                raise RuntimeError("No ASR workers available")
+        return min(live, key=lambda w: len(w.in_flight))
+
+    async def transcribe(self, audio_data: bytes) -> str:
+        """Transcribe raw 16kHz 16-bit mono PCM audio on an ASR worker"""
+        if len(audio_data) > self.ring.slot_size:
+            raise ValueError(f"Audio exceeds {settings.ASR_RING_SLOT_SECONDS}s ASR worker limit")
+        
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._free_slots = asyncio.Queue()
+            for slot in range(self.ring.slots):
+                self._free_slots.put_nowait(slot)
+        
+        # Waits while every slot is in use, bounding audio held in shared memory
+        slot = await self._free_slots.get()
+        try:
+            # Chosen after the wait so a worker that died meanwhile is skipped
+            worker = await self._pick_worker()
+        except BaseException:
+            self._free_slots.put_nowait(slot)
+            raise
+        self.ring.write(slot, audio_data)
+        
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = (future, slot, worker)
+        worker.in_flight.add(request_id)
+        try:
+            worker.conn.send(("transcribe", request_id, slot, len(audio_data)))
+        except OSError:
+            self._worker_lost(worker, worker.conn)
+        
+        try:
+            return await asyncio.wait_for(future, settings.ASR_WORKER_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"ASR worker {worker.address} timed out after {settings.ASR_WORKER_TIMEOUT}s")
+            self._drop_worker(worker)
+            raise RuntimeError(f"ASR worker {worker.address} timed out")
+
+    def close(self):
+        """Disconnect from the workers and release the shared memory"""
+        for worker in self.workers:
+            if worker.alive:
+                worker.conn.close()
+                worker.conn = None
+        self.ring.close()
+        self.ring.unlink()
+
+def _serve_connection(conn: Connection, speech_service, lock: threading.Lock):
+    """Handle the requests of one API process"""
+    ring = None
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "attach":
+                _, name, slot_size = message
+                ring = SharedAudioRing.attach(name, slot_size)
+            elif message[0] == "transcribe":
+                _, request_id, slot, nbytes = message
+                try:
+                    audio_data = ring.read(slot, nbytes)
+                    with lock:
+                        text = speech_service.transcribe(audio_data)
+                    conn.send(("result", request_id, text))
+                except Exception as e:
+                    logger.error(f"Error transcribing request {request_id}: {str(e)}")
+                    conn.send(("error", request_id, str(e)))
+    except (EOFError, OSError):
+        logger.info("ASR client disconnected")
+    finally:
+        conn.close()
+        if ring is not None:
+            ring.close()
+
+def serve(address: str):
+    """Load the speech model once and serve transcription requests on address"""
+    from .speech_service import SpeechService
+    
+    speech_service = SpeechService()
+    speech_service.warmup()
+    lock = threading.Lock()
+    
+    authkey = _authkey()
+    # Workers share a host with the API, so listen on a local socket (a named
+    # pipe on Windows) instead of a network port
+    if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+        os.unlink(address)  # Stale socket from a previous run
+    
+    with Listener(address, authkey=authkey) as listener:
+        if os.path.exists(address):
+            os.chmod(address, 0o600)
+        logger.info(f"ASR worker listening on {address}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"Rejected ASR client connection: {str(e)}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn, speech_service, lock), daemon=True).start()
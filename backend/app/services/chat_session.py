@@ -0,0 +1,256 @@
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set
+from fastapi import WebSocket, WebSocketDisconnect
+from .speech_service import SpeechService
+from .nlp_service import NLPService
+from .voice_pipeline import VoicePipeline
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ChatSession:
+    """
+    Multiplexed chat session over a single WebSocket connection.
+
+    Every frame is a JSON object with a "type" and, for request traffic, an
+    "id" chosen by the client. Client messages:
+        {"type": "text", "id": ..., "text": ...}
+        {"type": "audio", "id": ..., "data": <base64 16kHz 16-bit mono PCM>}
+        {"type": "audio_end", "id": ...}
+        {"type": "cancel", "id": ...}
+        {"type": "pong"}
+    Server messages:
+        {"type": "partial", "id": ..., "text": ...}
+        {"type": "result", "id": ..., "text": ..., "transcript": ...}
+        {"type": "cancelled", "id": ...}
+        {"type": "error", "id": ..., "detail": ...}
+        {"type": "ping"}
+
+    Requests run concurrently up to WEBSOCKET_MAX_IN_FLIGHT and outgoing
+    frames go through a bounded queue. Each audio stream buffers at most
+    WEBSOCKET_AUDIO_QUEUE_SIZE undrained chunks; a stream that overflows is
+    failed with a single error frame so it never stalls the others.
+    """
+
+    def __init__(self, websocket: WebSocket, speech_service: SpeechService, nlp_service: NLPService):
+        self.websocket = websocket
+        self.speech_service = speech_service
+        self.nlp_service = nlp_service
+        
+        self._outgoing: asyncio.Queue = asyncio.Queue(maxsize=settings.WEBSOCKET_SEND_QUEUE_SIZE)
+        self._slots = asyncio.Semaphore(settings.WEBSOCKET_MAX_IN_FLIGHT)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._audio_queues: Dict[str, asyncio.Queue] = {}
+        self._cancelled: Set[str] = set()
+        self._cancelling: Set[asyncio.Task] = set()
+        self._last_received = time.monotonic()
+
+    async def run(self):
+        """Serve the connection until the client disconnects or stops answering"""
+        receiver = asyncio.create_task(self._receive_loop())
+        sender = asyncio.create_task(self._send_loop())
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        loops = {receiver, sender, heartbeat}
+        try:
+            done, _ = await asyncio.wait(loops, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            tasks = list(self._tasks.values()) + list(self._cancelling) + list(loops)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if heartbeat in done:
+            logger.warning("WebSocket heartbeat timed out, closing connection")
+            await self._close()
+            return
+        
+        for task in done:
+            error = None if task.cancelled() else task.exception()
+            if isinstance(error, WebSocketDisconnect):
+                logger.info("WebSocket client disconnected")
+            elif error is not None:
+                logger.error(f"WebSocket error: {str(error)}")
+                await self._close()
+
+    async def _close(self):
+        """Close the socket, ignoring errors if it is already gone"""
+        try:
+            await self.websocket.close(code=1011)
+        except Exception:
+            pass
+
+    async def _send(self, message: Dict[str, Any]):
+        """Queue a frame for the client, waiting while the send queue is full"""
+        await self._outgoing.put(message)
+
+    async def _send_loop(self):
+        """Write queued frames to the socket in order"""
+        while True:
+            message = await self._outgoing.get()
+            await self.websocket.send_json(message)
+
+    async def _heartbeat_loop(self):
+        """Ping the client and close the connection if it stops answering"""
+        while True:
+            await asyncio.sleep(settings.WEBSOCKET_PING_INTERVAL)
+            ping_sent = time.monotonic()
+            await self._send({"type": "ping"})
+            await asyncio.sleep(settings.WEBSOCKET_PING_TIMEOUT)
+            # Any frame from the client counts as a sign of life
+            if self._last_received < ping_sent:
+                return
+
+    async def _receive_loop(self):
+        """Read client frames and dispatch them by type"""
+        while True:
+            raw = await self.websocket.receive_text()
+            self._last_received = time.monotonic()
+            
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                await self._send({"type": "error", "id": None, "detail": "Invalid JSON frame"})
+                continue
+            
+            if not isinstance(message, dict):
+                await self._send({"type": "error", "id": None, "detail": "Frame must be a JSON object"})
+                continue
+            
+            message_type = message.get("type")
+            request_id = message.get("id")
+            
+            if message_type == "pong":
+                continue
+            
+            if request_id is None:
+                await self._send({"type": "error", "id": None, "detail": "Missing request id"})
+                continue
+            if isinstance(request_id, bool) or not isinstance(request_id, (str, int)):
+                await self._send({"type": "error", "id": None, "detail": "Request id must be a string or integer"})
+                continue
+            
+            if message_type == "text":
+                await self._start(request_id, self._handle_text(request_id, message.get("text", "")))
+            elif message_type in ("audio", "audio_end") and request_id in self._cancelled:
+                # Trailing chunks of a cancelled utterance, the id is reusable after its end
+                if message_type == "audio_end":
+                    self._cancelled.discard(request_id)
+                continue
+            elif message_type == "audio":
+                await self._handle_audio_chunk(request_id, message.get("data", ""))
+            elif message_type == "audio_end":
+                # Only streams still receiving audio stay in _audio_queues, so a
+                # later cancel of this id does not wait for another audio_end
+                queue = self._audio_queues.pop(request_id, None)
+                if queue is not None:
+                    # The end marker bypasses the chunk limit so a stream can always finish
+                    queue.put_nowait(None)
+            elif message_type == "cancel":
+                await self._cancel(request_id)
+            else:
+                await self._send({"type": "error", "id": request_id, "detail": f"Unknown message type: {message_type}"})
+
+    async def _start(self, request_id: str, coro) -> bool:
+        """Schedule a request, refusing it when the connection is saturated"""
+        if request_id in self._tasks:
+            coro.close()
+            await self._send({"type": "error", "id": request_id, "detail": "Duplicate request id"})
+            return False
+        if len(self._tasks) >= settings.WEBSOCKET_MAX_PENDING:
+            coro.close()
+            await self._send({"type": "error", "id": request_id, "detail": "Too many requests in flight"})
+            return False
+        
+        task = asyncio.create_task(self._run_request(request_id, coro))
+        self._tasks[request_id] = task
+        return True
+
+    async def _run_request(self, request_id: str, coro):
+        """Run one request under the per-connection concurrency limit"""
+        try:
+            async with self._slots:
+                await coro
+        except asyncio.CancelledError:
+            # Closes the request coroutine if it was cancelled before it ever started
+            coro.close()
+        except Exception as e:
+            logger.error(f"Error processing request {request_id}: {str(e)}")
+            await self._send({"type": "error", "id": request_id, "detail": str(e)})
+        finally:
+            # A cancelled request has already released its id, which may be reused
+            if self._tasks.get(request_id) is asyncio.current_task():
+                del self._tasks[request_id]
+                self._audio_queues.pop(request_id, None)
+
+    async def _handle_text(self, request_id: str, text: str):
+        """Generate a response for a text message"""
+        response = await self.nlp_service.process_text(text)
+        await self._send({"type": "result", "id": request_id, "text": response})
+
+    async def _handle_audio_chunk(self, request_id: str, data: str):
+        """Route an audio chunk to its utterance, starting the utterance if new"""
+        try:
+            chunk = base64.b64decode(data, validate=True)
+        except (TypeError, ValueError):
+            await self._send({"type": "error", "id": request_id, "detail": "Invalid base64 audio data"})
+            return
+        
+        queue = self._audio_queues.get(request_id)
+        if queue is None:
+            if request_id in self._tasks:
+                await self._send({"type": "error", "id": request_id, "detail": "Request id is already in use"})
+                return
+            queue = asyncio.Queue()
+            if not await self._start(request_id, self._handle_audio(request_id, queue)):
+                return
+            self._audio_queues[request_id] = queue
+        
+        # Never block the shared receive loop: a stream that is not draining its
+        # chunks (e.g. still waiting for a slot) fails as a whole rather than
+        # producing a result from truncated audio
+        if queue.qsize() >= settings.WEBSOCKET_AUDIO_QUEUE_SIZE:
+            self._abort(request_id)
+            await self._send({"type": "error", "id": request_id, "detail": "Audio stream backlogged, request failed"})
+            return
+        queue.put_nowait(chunk)
+
+    async def _handle_audio(self, request_id: str, queue: asyncio.Queue):
+        """Transcribe a streamed utterance and generate its response"""
+        async def chunks() -> AsyncIterator[bytes]:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                yield chunk
+        
+        async def send_partial(text: str):
+            await self._send({"type": "partial", "id": request_id, "text": text})
+        
+        pipeline = VoicePipeline(self.speech_service, self.nlp_service)
+        transcript, response = await pipeline.run(chunks(), send_partial)
+        await self._send({"type": "result", "id": request_id, "transcript": transcript, "text": response})
+
+    async def _cancel(self, request_id: str):
+        """Cancel an in-flight request and free its server-side work"""
+        task: Optional[asyncio.Task] = self._tasks.get(request_id)
+        if task is None:
+            await self._send({"type": "error", "id": request_id, "detail": "Unknown request id"})
+            return
+        
+        self._abort(request_id)
+        await self._send({"type": "cancelled", "id": request_id})
+
+    def _abort(self, request_id: str):
+        """Cancel a request's task and release its id"""
+        task = self._tasks.pop(request_id)
+        # Skip the rest of a stream that is still sending audio
+        if self._audio_queues.pop(request_id, None) is not None:
+            self._cancelled.add(request_id)
+        # The task is still awaited on shutdown
+        self._cancelling.add(task)
+        task.add_done_callback(self._cancelling.discard)
+        task.cancel()
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+import random
+import re
+import string
+from typing import Dict, List, Optional, Set, Tuple
+from nltk.sentiment import SentimentIntensityAnalyzer
+from spacy.language import Language
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTENT_TABLE = os.path.join(os.path.dirname(__file__), "intents.json")
+
+# ASCII punctuation (apostrophes kept for "what's") plus the Devanagari dandas.
+# \w is avoided because it does not match Devanagari vowel signs.
+_PUNCTUATION = re.compile("[" + re.escape(string.punctuation.replace("'", "")) + "।॥]")
+
+class IntentService:
+    """
+    Local responder for common small-talk and command intents.
+
+    Messages are matched against a table of English and Hindi phrases,
+    first by exact lookup and then, for short messages, by spaCy lemmas:
+    a phrase matches when it contains every lemma of the message and the
+    message covers enough of the phrase. Matched intents are answered from templates without a
+    remote LLM call. Messages with clearly negative sentiment are left to
+    the LLM so they get an empathetic answer.
+    """
+
+    def __init__(self, nlp: Language, sia: SentimentIntensityAnalyzer, table_path: Optional[str] = None):
+        self.nlp = nlp
+        self.sia = sia
+        self.threshold = settings.INTENT_MATCH_THRESHOLD
+        self.max_words = settings.INTENT_MAX_WORDS
+        
+        table_path = table_path or settings.INTENT_TABLE_PATH or DEFAULT_INTENT_TABLE
+        with open(table_path, encoding="utf-8") as f:
+            self.intents = json.load(f)
+        
+        # Normalized phrase -> (intent, language) for exact lookup
+        self.phrases: Dict[str, Tuple[str, str]] = {}
+        # (token set, intent, language) for fuzzy matching
+        self.phrase_tokens: List[Tuple[Set[str], str, str]] = []
+        for intent, spec in self.intents.items():
+            for lang, phrases in spec["phrases"].items():
+                for phrase in phrases:
+                    normalized = self._normalize(phrase)
+                    self.phrases[normalized] = (intent, lang)
+                    self.phrase_tokens.append((self._tokens(normalized), intent, lang))
+        
+        logger.info(f"Loaded {len(self.intents)} intents with {len(self.phrases)} phrases from {table_path}")
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+    def _tokens(self, normalized: str) -> Set[str]:
+        """Lemmas for English text, plain tokens otherwise"""
+        if normalized.isascii():
+            doc = self.nlp(normalized, disable=["parser", "ner"])
+            return {token.lemma_.lower() for token in doc}
+        return set(normalized.split())
+
+    def match_intent(self, text: str) -> Optional[Tuple[str, str]]:
+        """Return the (intent, language) matched by the text, if any"""
+        normalized = self._normalize(text)
+        if not normalized:
+            return None
+        
+        match = self.phrases.get(normalized)
+        if match is not None:
+            return match
+        
+        if len(normalized.split()) > self.max_words:
+            return None
+        
+        tokens = self._tokens(normalized)
+        best_score, best_match = 0.0, None
+        for phrase_tokens, intent, lang in self.phrase_tokens:
+            # Every word of the message must belong to the phrase, so an extra
+            # word such as "old" in "how old are you" sends it to the LLM
+            if not tokens <= phrase_tokens:
+                continue
+            score = len(tokens) / len(phrase_tokens)
+            if score > best_score:
+                best_score, best_match = score, (intent, lang)
+        
+        return best_match if best_score >= self.threshold else None
+
+    def respond(self, text: str) -> Optional[str]:
+        """
+        Answer the text from the intent templates, or return None if it
+        should go to the LLM.
+        """
+        match = self.match_intent(text)
+        if match is None:
+            return None
+        
+        if self.sia.polarity_scores(text)["compound"] <= settings.INTENT_NEGATIVE_THRESHOLD:
+            return None
+        
+        intent, lang = match
+        responses = self.intents[intent]["responses"]
+        templates = responses.get(lang) or responses.get("en")
+        if not templates:
+            return None
+        
+        logger.info(f"Answering intent '{intent}' ({lang}) locally")
+        return random.choice(templates)
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+import torch
+from safetensors.torch import save_file
+from transformers import Wav2Vec2Config, Wav2Vec2ForCTC, Wav2Vec2Tokenizer
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+WEIGHTS_FILE = "model.safetensors"
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+def model_path(model_name: str, store_dir: Optional[str] = None) -> str:
+    """Return the store directory for a hub model id"""
+    store_dir = store_dir or settings.MODEL_STORE_DIR or MODELS_DIR
+    return os.path.join(store_dir, model_name.split("/")[-1])
+
+def is_prepared(model_name: str, store_dir: Optional[str] = None) -> bool:
+    """Check whether a model has been prepared in the local store"""
+    return os.path.isfile(os.path.join(model_path(model_name, store_dir), WEIGHTS_FILE))
+
+def prepare_model(model_name: str, store_dir: Optional[str] = None) -> str:
+    """
+    Download a model from the hub and write it to the local store with its
+    weights converted to safetensors. Returns the model directory.
+    """
+    path = model_path(model_name, store_dir)
+    os.makedirs(path, exist_ok=True)
+    
+    logger.info(f"Preparing {model_name} in {path}...")
+    tokenizer = Wav2Vec2Tokenizer.from_pretrained(model_name)
+    model = Wav2Vec2ForCTC.from_pretrained(model_name)
+    
+    tokenizer.save_pretrained(path)
+    model.config.save_pretrained(path)
+    
+    state_dict = {name: tensor.contiguous() for name, tensor in model.state_dict().items()}
+    save_file(state_dict, os.path.join(path, WEIGHTS_FILE), metadata={"format": "pt"})
+    
+    logger.info(f"Model {model_name} prepared successfully!")
+    return path
+
+def _contiguous_stride(shape: List[int]) -> List[int]:
+    stride = []
+    size = 1
+    for dim in reversed(shape):
+        stride.insert(0, size)
+        size *= dim
+    return stride
+
+def load_mmap_state_dict(filename: str) -> Dict[str, torch.Tensor]:
+    """
+    Load a safetensors file as tensors backed by a private memory map of the
+    file. Pages are read lazily and shared with other processes through the
+    page cache until written.
+    """
+    with open(filename, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    
+    data_start = 8 + header_size
+    storage = torch.UntypedStorage.from_file(filename, shared=False, nbytes=os.path.getsize(filename))
+    
+    state_dict = {}
+    for name, info in header.items():
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        start, _ = info["data_offsets"]
+        itemsize = torch.empty((), dtype=dtype).element_size()
+        offset = data_start + start
+        if offset % itemsize:
+            raise ValueError(f"Tensor {name} in {filename} is not aligned for {info['dtype']}")
+        
+        shape = info["shape"]
+        tensor = torch.empty((0,), dtype=dtype)
+        tensor.set_(storage, offset // itemsize, shape, _contiguous_stride(shape))
+        state_dict[name] = tensor
+    return state_dict
+
+def load_model(model_name: str, store_dir: Optional[str] = None) -> Tuple[Wav2Vec2Tokenizer, Wav2Vec2ForCTC]:
+    """Load the tokenizer and a memory-mapped model from the local store"""
+    path = model_path(model_name, store_dir)
+    
+    tokenizer = Wav2Vec2Tokenizer.from_pretrained(path, local_files_only=True)
+    config = Wav2Vec2Config.from_pretrained(path, local_files_only=True)
+    
+    # Build the module without allocating weights, then adopt the mapped tensors
+    with torch.device("meta"):
+        model = Wav2Vec2ForCTC(config)
+    model.load_state_dict(load_mmap_state_dict(os.path.join(path, WEIGHTS_FILE)), assign=True)
+    
+    missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"Model store at {path} is missing tensors: {', '.join(missing)}")
+    
+    model.eval()
+    return tokenizer, model
@@ -7,6 +7,8 @@ import openai
 from deep_translator import GoogleTranslator
 import os
 from dotenv import load_dotenv
+from .intent_service import IntentService
+from ..core.config import settings
 
 # Download required NLTK data
 nltk.download('punkt')
@@ -18,11 +20,18 @@ class NLPService:
         self.sia = SentimentIntensityAnalyzer()
         self.nlp = spacy.load('en_core_web_sm')
         openai.api_key = os.getenv('OPENAI_API_KEY')
+        self.intent_service = IntentService(self.nlp, self.sia) if settings.INTENT_FAST_PATH else None
 
     async def process_text(self, text: str) -> str:
         """
         Process the input text and generate an appropriate response.
         """
+        # Answer common intents locally, skipping language detection and the LLM
+        if self.intent_service is not None:
+            response = self.intent_service.respond(text)
+            if response is not None:
+                return response
+        
         # Detect language
         lang = self.detect_language(text)
         
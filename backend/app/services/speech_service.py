@@ -4,23 +4,34 @@ import io
 from typing import Optional
 import asyncio
 from deep_translator import GoogleTranslator
-import wave
 import json
 import os
-import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 import torch
 from transformers import Wav2Vec2ForCTC, Wav2Vec2Tokenizer
-import soundfile as sf
 import librosa
 import logging
+from ..core.config import settings
+from . import model_store
+from .asr_worker import ASRWorkerClient
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class _LogitsModule(torch.nn.Module):
+    """Wraps the CTC model so tracing sees a plain tensor output"""
+
+    def __init__(self, model: Wav2Vec2ForCTC):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_values: torch.Tensor) -> torch.Tensor:
+        return self.model(input_values).logits
+
 class SpeechService:
-    def __init__(self):
+    def __init__(self, asr_client: Optional[ASRWorkerClient] = None):
         try:
             logger.info("Initializing SpeechService...")
             
@@ -35,12 +46,41 @@ class SpeechService:
             self.min_energy_threshold = 3000  # Much higher minimum threshold
             self.max_energy_threshold = 10000  # Maximum threshold to prevent over-sensitivity
             
-            # Initialize wav2vec2 model
-            logger.info("Loading wav2vec2 model...")
-            # Using the correct model identifier
-            self.model_name = "facebook/wav2vec2-base-960h"
+            self.asr_client = asr_client
+            if self.asr_client is not None:
+                # Inference runs in dedicated ASR worker processes
+                logger.info("Using dedicated ASR workers, skipping local model load")
+                self.optimization = "none"
+            else:
+                self._load_model()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.SPEECH_INFERENCE_THREADS,
+                    thread_name_prefix="speech-inference"
+                )
+            
+            logger.info("SpeechService initialized successfully!")
             
-            try:
+        except Exception as e:
+            logger.error(f"Failed to initialize SpeechService: {str(e)}")
+            raise
+
+    def _load_model(self):
+        """Load the wav2vec2 model, preferring the local model store"""
+        logger.info("Loading wav2vec2 model...")
+        # Using the correct model identifier
+        self.model_name = settings.MODEL_NAME
+        
+        try:
+            if model_store.is_prepared(self.model_name):
+                logger.info(f"Loading {self.model_name} from local model store...")
+                self.tokenizer, self.model = model_store.load_model(self.model_name)
+                logger.info("Model loaded successfully!")
+            elif settings.MODEL_OFFLINE:
+                raise RuntimeError(
+                    f"{self.model_name} is not in the local model store, "
+                    "run 'python run.py --mode prepare-models' first"
+                )
+            else:
                 logger.info(f"Loading tokenizer from {self.model_name}...")
                 self.tokenizer = Wav2Vec2Tokenizer.from_pretrained(self.model_name)
                 logger.info("Tokenizer loaded successfully!")
@@ -48,25 +88,133 @@ class SpeechService:
                 logger.info(f"Loading model from {self.model_name}...")
                 self.model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
                 logger.info("Model loaded successfully!")
-                
-                # Move model to GPU if available
-                if torch.cuda.is_available():
-                    logger.info("Moving model to GPU...")
-                    self.model = self.model.to('cuda')
-                    logger.info("Model moved to GPU successfully!")
-                else:
-                    logger.info("No GPU available, using CPU")
-                
-            except Exception as e:
-                logger.error(f"Error loading wav2vec2 model: {str(e)}")
-                raise
             
-            logger.info("SpeechService initialized successfully!")
+            # Move model to GPU if available
+            if torch.cuda.is_available():
+                logger.info("Moving model to GPU...")
+                self.model = self.model.to('cuda')
+                logger.info("Model moved to GPU successfully!")
+            else:
+                logger.info("No GPU available, using CPU")
+            
+            self.model.eval()
+            self._setup_optimization()
             
         except Exception as e:
-            logger.error(f"Failed to initialize SpeechService: {str(e)}")
+            logger.error(f"Error loading wav2vec2 model: {str(e)}")
             raise
 
+    def _setup_optimization(self):
+        """Prepare the optimized execution mode and its input-length buckets"""
+        self.optimization = settings.SPEECH_MODEL_OPTIMIZATION
+        self.length_buckets = sorted(
+            int(seconds * 16000) for seconds in settings.SPEECH_MODEL_LENGTH_BUCKETS
+        )
+        self._compiled_model = None
+        self._traced_models = {}
+        
+        if self.optimization == "none":
+            return
+        
+        if self.optimization == "compile":
+            logger.info("Compiling wav2vec2 model with torch.compile...")
+            # Static shapes: one graph per length bucket, reused on every call
+            self._compiled_model = torch.compile(self.model, dynamic=False)
+        elif self.optimization == "torchscript":
+            logger.info("Tracing and freezing wav2vec2 model for each length bucket...")
+            device = next(self.model.parameters()).device
+            wrapper = _LogitsModule(self.model).eval()
+            for length in self.length_buckets:
+                example = torch.zeros(1, length, device=device)
+                with torch.no_grad():
+                    traced = torch.jit.trace(wrapper, example)
+                self._traced_models[length] = torch.jit.freeze(traced)
+        else:
+            raise ValueError(f"Unknown speech model optimization: {self.optimization}")
+        
+        logger.info(f"Speech model optimization '{self.optimization}' enabled with buckets: {self.length_buckets}")
+
+    def _bucket_length(self, length: int) -> Optional[int]:
+        """Return the smallest bucket that fits the input, or None if it is too long"""
+        for bucket in self.length_buckets:
+            if length <= bucket:
+                return bucket
+        return None
+
+    def _run_model(self, input_values: torch.Tensor) -> torch.Tensor:
+        """
+        Run the model and return logits for the given input values.
+        In optimized mode the input is zero-padded to its length bucket so the
+        compiled graph for that shape is reused, and the logits are trimmed back
+        to the frames covered by the real audio. The model takes no attention
+        mask, so padding also perturbs the real frames slightly; finer buckets
+        keep the padding, and the difference from eager mode, small.
+        """
+        input_values = input_values.to(next(self.model.parameters()).device)
+        length = input_values.shape[-1]
+        bucket = self._bucket_length(length) if self.optimization != "none" else None
+        
+        with torch.no_grad():
+            if bucket is None:
+                # Eager fallback for unoptimized mode and inputs beyond the largest bucket
+                return self.model(input_values).logits
+            
+            padded = torch.nn.functional.pad(input_values, (0, bucket - length))
+            if self.optimization == "compile":
+                logits = self._compiled_model(padded).logits
+            else:
+                logits = self._traced_models[bucket](padded)
+            
+            num_frames = int(self.model._get_feat_extract_output_lengths(length))
+            return logits[:, :num_frames]
+
+    def warmup(self):
+        """
+        Run each length bucket once so compilation, allocation and kernel
+        selection happen at startup instead of on the first request.
+        """
+        if self.optimization == "none" or not settings.SPEECH_MODEL_WARMUP:
+            return
+        
+        logger.info("Warming up speech model...")
+        start = time.time()
+        for bucket in self.length_buckets:
+            self._run_model(torch.zeros(1, bucket))
+        logger.info(f"Speech model warmup finished in {time.time() - start:.2f}s")
+        
+        self._check_parity()
+
+    def _check_parity(self):
+        """
+        Compare optimized and eager predictions at each bucket's worst case,
+        audio one sample longer than the previous bucket. wav2vec2-base-960h
+        takes no attention mask, so the zero padding shifts the group-norm
+        statistics of the real frames too; this logs how far that moves the
+        predicted tokens. It uses a fixed synthetic signal, not real speech.
+        """
+        device = next(self.model.parameters()).device
+        generator = torch.Generator().manual_seed(0)
+        previous = 0
+        for bucket in self.length_buckets:
+            length = previous + 1 if previous else bucket // 2
+            input_values = torch.randn(1, length, generator=generator)
+            
+            optimized = self._run_model(input_values)
+            with torch.no_grad():
+                eager = self.model(input_values.to(device)).logits
+            
+            agreement = (optimized.argmax(-1) == eager.argmax(-1)).float().mean().item()
+            max_diff = (optimized - eager).abs().max().item()
+            message = (
+                f"Bucket {bucket / 16000:.1f}s parity at {length / 16000:.2f}s input: "
+                f"{agreement:.1%} token agreement, max logit difference {max_diff:.3f}"
+            )
+            if agreement < 0.99:
+                logger.warning(f"{message}; consider finer SPEECH_MODEL_LENGTH_BUCKETS")
+            else:
+                logger.info(message)
+            previous = bucket
+
     def _preprocess_audio(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
         """Preprocess audio for better recognition"""
         # Resample to 16kHz if needed
@@ -81,54 +229,57 @@ class SpeechService:
         
         return audio
 
+    def transcribe(self, audio_data: bytes) -> str:
+        """
+        Convert raw 16kHz 16-bit mono PCM audio to text using wav2vec2.
+        Returns the raw transcription; runs synchronously on the calling thread.
+        """
+        # Decode the PCM in memory; a truncated trailing byte is dropped
+        audio = np.frombuffer(audio_data[:len(audio_data) // 2 * 2], dtype=np.int16)
+        audio = audio.astype(np.float32) / 32768.0
+        sample_rate = 16000
+        
+        # Preprocess audio
+        audio = self._preprocess_audio(audio, sample_rate)
+        
+        # Tokenize audio
+        inputs = self.tokenizer(
+            audio,
+            sampling_rate=16000,
+            return_tensors="pt",
+            padding=True
+        )
+        
+        # Get model prediction
+        logits = self._run_model(inputs.input_values)
+        
+        # Get predicted ids
+        predicted_ids = torch.argmax(logits, dim=-1)
+        
+        # Decode prediction
+        return self.tokenizer.batch_decode(predicted_ids)[0]
+
+    async def transcribe_async(self, audio_data: bytes) -> str:
+        """
+        Run transcription on the inference executor so the event loop stays
+        free for other requests and for overlapping NLP work. The executor is
+        small so concurrent partial and final transcriptions queue up instead
+        of oversubscribing torch's own threads.
+        """
+        if self.asr_client is not None:
+            return await self.asr_client.transcribe(audio_data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.transcribe, audio_data)
+
     async def process_audio(self, audio_data: bytes) -> str:
         """
         Process audio data and convert it to text using wav2vec2.
         Supports both English and Hindi speech recognition.
         """
-        temp_file = None
         try:
-            # Save audio data to a temporary WAV file
-            temp_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            temp_file.close()
-            
-            # Convert bytes to WAV file
-            with wave.open(temp_file.name, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(16000)  # 16kHz
-                wav_file.writeframes(audio_data)
-            
             print("Attempting to recognize speech using wav2vec2...")
             
-            # Read audio file
-            audio, sample_rate = sf.read(temp_file.name)
-            
-            # Ensure audio is mono and float32
-            if len(audio.shape) > 1:
-                audio = audio.mean(axis=1)
-            audio = audio.astype(np.float32)
-            
-            # Preprocess audio
-            audio = self._preprocess_audio(audio, sample_rate)
-            
-            # Tokenize audio
-            inputs = self.tokenizer(
-                audio,
-                sampling_rate=16000,
-                return_tensors="pt",
-                padding=True
-            )
-            
-            # Get model prediction
-            with torch.no_grad():
-                logits = self.model(inputs.input_values).logits
-            
-            # Get predicted ids
-            predicted_ids = torch.argmax(logits, dim=-1)
-            
-            # Decode prediction
-            transcription = self.tokenizer.batch_decode(predicted_ids)[0]
+            transcription = await self.transcribe_async(audio_data)
             
             if transcription and transcription.strip():
                 # Calculate confidence based on word count and length
@@ -146,15 +297,6 @@ class SpeechService:
         except Exception as e:
             print(f"Error processing audio: {str(e)}")
             return f"Error processing audio: {str(e)}"
-        finally:
-            # Clean up temporary file with retry
-            if temp_file and os.path.exists(temp_file.name):
-                try:
-                    # Close any open file handles
-                    time.sleep(0.1)  # Give time for file handles to close
-                    os.unlink(temp_file.name)
-                except Exception as e:
-                    print(f"Warning: Could not delete temporary file: {str(e)}")
 
     def detect_language(self, text: str) -> str:
         """
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+from .speech_service import SpeechService
+from .nlp_service import NLPService
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 16kHz, 16-bit mono PCM
+BYTES_PER_SECOND = 16000 * 2
+
+class VoicePipeline:
+    """
+    Endpointing-aware voice pipeline for a single utterance.
+
+    Audio chunks are transcribed incrementally while they arrive. Once a
+    partial transcript has stayed unchanged for SPECULATIVE_STABLE_INTERVAL
+    seconds, the NLP stage is started speculatively on it. When the final
+    transcript matches, the speculative response is used; otherwise it is
+    cancelled and the response is generated from the final transcript.
+    """
+
+    def __init__(self, speech_service: SpeechService, nlp_service: NLPService):
+        self.speech_service = speech_service
+        self.nlp_service = nlp_service
+        self.partial_step = int(settings.SPECULATIVE_PARTIAL_INTERVAL * BYTES_PER_SECOND)
+        self.stable_interval = settings.SPECULATIVE_STABLE_INTERVAL
+        
+        self._partial_text: Optional[str] = None
+        self._partial_since = 0.0
+        self._speculative_text: Optional[str] = None
+        self._speculative_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Normalize a transcript for comparison"""
+        return " ".join(text.lower().split())
+
+    async def run(
+        self,
+        chunks: AsyncIterator[bytes],
+        on_partial: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Tuple[str, str]:
+        """
+        Consume the audio chunks of one utterance and return the final
+        transcript together with the generated response.
+        """
+        buffer = bytearray()
+        transcribed_size = 0
+        partial_task: Optional[asyncio.Task] = None
+        
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                
+                if partial_task is not None and partial_task.done():
+                    await self._handle_partial(partial_task, on_partial)
+                    partial_task = None
+                
+                # Only one partial transcription in flight at a time
+                if partial_task is None and len(buffer) - transcribed_size >= self.partial_step:
+                    transcribed_size = len(buffer)
+                    partial_task = asyncio.create_task(
+                        self.speech_service.transcribe_async(bytes(buffer))
+                    )
+            
+            if partial_task is not None:
+                # A partial that finished as speech ended is the most likely to
+                # match the final transcript, so it still counts toward speculation
+                if partial_task.done():
+                    await self._handle_partial(partial_task, on_partial)
+                else:
+                    partial_task.cancel()
+            
+            text = await self.speech_service.process_audio(bytes(buffer))
+            
+            if (
+                self._speculative_task is not None
+                and self._normalize(text) == self._normalize(self._speculative_text)
+            ):
+                logger.info("Final transcript matches speculative prefetch, reusing response")
+                response = await self._speculative_task
+            else:
+                self._cancel_speculation()
+                response = await self.nlp_service.process_text(text)
+            
+            return text, response
+        
+        finally:
+            if partial_task is not None:
+                partial_task.cancel()
+            if self._speculative_task is not None and not self._speculative_task.done():
+                self._speculative_task.cancel()
+
+    async def _handle_partial(
+        self,
+        partial_task: asyncio.Task,
+        on_partial: Optional[Callable[[str], Awaitable[None]]]
+    ):
+        """Track partial transcript stability and start speculation when stable"""
+        try:
+            text = partial_task.result()
+        except Exception as e:
+            logger.warning(f"Partial transcription failed: {str(e)}")
+            return
+        
+        if not text or not text.strip():
+            return
+        
+        now = time.monotonic()
+        if self._partial_text is None or self._normalize(text) != self._normalize(self._partial_text):
+            self._partial_text = text
+            self._partial_since = now
+            # The transcript moved on, so any earlier speculation is stale
+            self._cancel_speculation()
+            if on_partial is not None:
+                await on_partial(text)
+            return
+        
+        if self._speculative_task is None and now - self._partial_since >= self.stable_interval:
+            logger.info(f"Partial transcript stable, prefetching response for: {text}")
+            self._speculative_text = text
+            self._speculative_task = asyncio.create_task(self.nlp_service.process_text(text))
+
+    def _cancel_speculation(self):
+        """Cancel the in-flight speculative NLP request, if any"""
+        if self._speculative_task is not None:
+            if not self._speculative_task.done():
+                logger.info("Cancelling speculative response")
+                self._speculative_task.cancel()
+            self._speculative_task = None
+            self._speculative_text = None
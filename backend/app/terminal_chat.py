@@ -10,6 +10,7 @@ import signal
 class TerminalChat:
     def __init__(self):
         self.speech_service = SpeechService()
+        self.speech_service.warmup()
         self.nlp_service = NLPService()
         self.recognizer = sr.Recognizer()
         self.is_running = True
@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from app.services.speech_service import SpeechService
 from app.services.nlp_service import NLPService
+from app.services.chat_session import ChatSession
+from app.services.asr_worker import ASRWorkerClient
 from app.core.config import settings
 import logging
 
@@ -24,13 +26,26 @@ app.add_middleware(
 # Initialize services
 try:
     logger.info("Initializing services...")
-    speech_service = SpeechService()
+    # Hand inference to dedicated ASR workers when configured
+    asr_client = ASRWorkerClient(settings.ASR_WORKER_ADDRESSES) if settings.ASR_WORKER_ADDRESSES else None
+    speech_service = SpeechService(asr_client=asr_client)
     nlp_service = NLPService()
     logger.info("Services initialized successfully!")
 except Exception as e:
     logger.error(f"Failed to initialize services: {str(e)}")
     raise
 
+@app.on_event("startup")
+async def warmup_models():
+    """Warm up optimized speech model graphs before serving requests"""
+    speech_service.warmup()
+
+@app.on_event("shutdown")
+async def close_asr_client():
+    """Release the shared memory used to talk to ASR workers"""
+    if asr_client is not None:
+        asr_client.close()
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the NLP Chatbot API"}
@@ -72,25 +87,14 @@ async def chat_voice(audio: bytes, language: str = "en"):
 
 @app.websocket("/ws/chat")
 async def websocket_endpoint(websocket: WebSocket):
+    """
+    Multiplexed chat over one persistent connection. See ChatSession for
+    the framed protocol: text and streamed audio requests carry client
+    chosen ids, run concurrently, and can be cancelled.
+    """
     await websocket.accept()
-    try:
-        while True:
-            # Receive audio data
-            data = await websocket.receive_bytes()
-            
-            # Process speech to text
-            text = await speech_service.process_audio(data)
-            
-            # Process text with NLP
-            response = await nlp_service.process_text(text)
-            
-            # Send response back to client
-            await websocket.send_text(response)
-            
-    except Exception as e:
-        logger.error(f"WebSocket error: {str(e)}")
-        await websocket.close()
-        raise HTTPException(status_code=500, detail=str(e))
+    session = ChatSession(websocket, speech_service, nlp_service)
+    await session.run()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the "app" package importable the same way main.py sees it
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
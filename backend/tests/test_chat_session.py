@@ -0,0 +1,141 @@
+import asyncio
+import base64
+import json
+from fastapi import WebSocketDisconnect
+from app.core.config import settings
+from app.services.chat_session import ChatSession
+
+class FakeWebSocket:
+    """
+    Feeds scripted frames, then waits until the test closes the connection.
+    A callable in the script pauses reading until it returns True for the
+    frames sent so far.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.received = 0
+        self.sent = []
+        self.closed = asyncio.Event()
+
+    async def receive_text(self):
+        while self.frames and callable(self.frames[0]):
+            wait_until = self.frames.pop(0)
+            while not wait_until(self.sent):
+                await asyncio.sleep(0.01)
+        if self.frames:
+            # Yield like a real socket read so request tasks get to run
+            await asyncio.sleep(0)
+            self.received += 1
+            return self.frames.pop(0)
+        await self.closed.wait()
+        raise WebSocketDisconnect(1000)
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed.set()
+
+class FakeSpeechService:
+    async def transcribe_async(self, audio_data):
+        return ""
+
+    async def process_audio(self, audio_data):
+        return f"{len(audio_data)} bytes"
+
+class FakeNLPService:
+    async def process_text(self, text):
+        await asyncio.sleep(0.01)
+        return f"reply to {text}"
+
+def _run_session(websocket, until):
+    """Run a session until the sent frames satisfy until(), then disconnect"""
+    async def main():
+        session = ChatSession(websocket, FakeSpeechService(), FakeNLPService())
+        runner = asyncio.create_task(session.run())
+        while not until(websocket.sent):
+            await asyncio.sleep(0.01)
+        websocket.closed.set()
+        await runner
+    asyncio.run(asyncio.wait_for(main(), timeout=5))
+
+def _results(sent):
+    return {message["id"]: message for message in sent if message["type"] == "result"}
+
+def _frames(sent, message_type, request_id):
+    return [m for m in sent if m["type"] == message_type and m["id"] == request_id]
+
+def test_interleaved_audio_streams_above_in_flight_limit(monkeypatch):
+    monkeypatch.setattr(settings, "WEBSOCKET_MAX_IN_FLIGHT", 4)
+    monkeypatch.setattr(settings, "WEBSOCKET_AUDIO_QUEUE_SIZE", 8)
+    monkeypatch.setattr(settings, "WEBSOCKET_PING_INTERVAL", 60)
+    
+    chunk = base64.b64encode(b"\0" * 10).decode()
+    frames = []
+    for _ in range(70):
+        for stream in range(5):
+            frames.append(json.dumps({"type": "audio", "id": f"s{stream}", "data": chunk}))
+    for stream in range(5):
+        frames.append(json.dumps({"type": "audio_end", "id": f"s{stream}"}))
+    frames.append(json.dumps({"type": "text", "id": "t", "text": "hi"}))
+    
+    websocket = FakeWebSocket(frames)
+    _run_session(websocket, lambda sent: len(_results(sent)) == 5 and websocket.received == 356)
+    
+    results = _results(websocket.sent)
+    assert websocket.received == 356
+    assert results["s0"]["transcript"] == "700 bytes"
+    # The stream waiting for a slot overflows and fails as a whole, never with truncated audio
+    assert "s4" not in results
+    assert len(_frames(websocket.sent, "error", "s4")) == 1
+    assert results["t"]["text"] == "reply to hi"
+
+def test_malformed_frames_do_not_end_session():
+    frames = [
+        "not json",
+        json.dumps([1, 2]),
+        json.dumps({"type": "text", "id": [1], "text": "x"}),
+        json.dumps({"type": "audio", "id": "a", "data": 5}),
+        json.dumps({"type": "text", "id": 7, "text": "hello"}),
+    ]
+    websocket = FakeWebSocket(frames)
+    _run_session(websocket, lambda sent: 7 in _results(sent))
+    
+    errors = [m for m in websocket.sent if m["type"] == "error"]
+    assert len(errors) == 4
+    assert _results(websocket.sent)[7]["text"] == "reply to hello"
+
+def test_cancelled_audio_id_is_reusable_after_audio_end():
+    chunk = base64.b64encode(b"\0" * 10).decode()
+    frames = [
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "cancel", "id": "a"}),
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "audio_end", "id": "a"}),
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "audio_end", "id": "a"}),
+    ]
+    websocket = FakeWebSocket(frames)
+    _run_session(websocket, lambda sent: "a" in _results(sent))
+    
+    assert any(m["type"] == "cancelled" and m["id"] == "a" for m in websocket.sent)
+    assert _results(websocket.sent)["a"]["transcript"] == "10 bytes"
+
+def test_cancel_after_audio_end_does_not_swallow_next_utterance():
+    chunk = base64.b64encode(b"\0" * 10).decode()
+    frames = [
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "audio_end", "id": "a"}),
+        json.dumps({"type": "cancel", "id": "a"}),
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "audio_end", "id": "a"}),
+        lambda sent: len(_frames(sent, "result", "a")) == 1,
+        json.dumps({"type": "audio", "id": "a", "data": chunk}),
+        json.dumps({"type": "audio_end", "id": "a"}),
+    ]
+    websocket = FakeWebSocket(frames)
+    _run_session(websocket, lambda sent: len(_frames(sent, "result", "a")) == 2)
+    
+    assert len(_frames(websocket.sent, "cancelled", "a")) == 1
+    assert not _frames(websocket.sent, "error", "a")
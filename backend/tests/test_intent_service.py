@@ -0,0 +1,33 @@
+import nltk
+import pytest
+import spacy
+from nltk.sentiment import SentimentIntensityAnalyzer
+from app.services.intent_service import IntentService
+
+@pytest.fixture(scope="module")
+def intent_service():
+    nltk.download('vader_lexicon', quiet=True)
+    return IntentService(spacy.load('en_core_web_sm'), SentimentIntensityAnalyzer())
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hi!", ("greeting", "en")),
+    ("Thank you very much!!", ("thanks", "en")),
+    ("you are a bot?", ("identity", "en")),
+    ("नमस्ते।", ("greeting", "hi")),
+    ("आप कैसे हैं?", ("how_are_you", "hi")),
+])
+def test_common_intents_match(intent_service, text, expected):
+    assert intent_service.match_intent(text) == expected
+    assert intent_service.respond(text) is not None
+
+@pytest.mark.parametrize("text", [
+    "how old are you",
+    "how do you do this",
+    "what are you doing",
+    "who are you talking",
+    "hello there friend",
+    "what is the weather in delhi",
+])
+def test_real_questions_go_to_llm(intent_service, text):
+    assert intent_service.match_intent(text) is None
+    assert intent_service.respond(text) is None
@@ -0,0 +1,74 @@
+import asyncio
+from app.core.config import settings
+from app.services.voice_pipeline import VoicePipeline
+
+class FakeSpeechService:
+    """Returns scripted partial transcripts and a fixed final transcript"""
+
+    def __init__(self, partials, final, nlp_service):
+        self.partials = list(partials)
+        self.final = final
+        self.nlp_service = nlp_service
+        self.nlp_calls_before_final = None
+
+    async def transcribe_async(self, audio_data):
+        return self.partials.pop(0) if self.partials else ""
+
+    async def process_audio(self, audio_data):
+        await asyncio.sleep(0.02)
+        # NLP calls that overlapped with the final transcription
+        self.nlp_calls_before_final = len(self.nlp_service.calls)
+        return self.final
+
+class FakeNLPService:
+    def __init__(self):
+        self.calls = []
+        self.cancelled = []
+
+    async def process_text(self, text):
+        self.calls.append(text)
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+        return f"reply to {text}"
+
+async def _chunks(count):
+    for _ in range(count):
+        yield b"\0" * 10
+        # Give the partial transcription task time to finish
+        await asyncio.sleep(0.01)
+
+def _run(partials, final, chunk_count, monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_PARTIAL_INTERVAL", 10 / 32000)
+    monkeypatch.setattr(settings, "SPECULATIVE_STABLE_INTERVAL", 0)
+    nlp_service = FakeNLPService()
+    speech_service = FakeSpeechService(partials, final, nlp_service)
+    pipeline = VoicePipeline(speech_service, nlp_service)
+    result = asyncio.run(pipeline.run(_chunks(chunk_count)))
+    return result, speech_service, nlp_service
+
+def test_speculative_response_reused_when_final_matches(monkeypatch):
+    (text, response), speech_service, nlp_service = _run(["hello", "hello", "hello"], "Hello", 3, monkeypatch)
+    
+    assert text == "Hello"
+    assert response == "reply to hello"
+    assert speech_service.nlp_calls_before_final == 1
+    assert nlp_service.calls == ["hello"]
+    assert nlp_service.cancelled == []
+
+def test_speculative_response_cancelled_when_final_differs(monkeypatch):
+    (text, response), _, nlp_service = _run(["hello", "hello", "hello"], "hello there", 3, monkeypatch)
+    
+    assert response == "reply to hello there"
+    assert nlp_service.calls == ["hello", "hello there"]
+    assert nlp_service.cancelled == ["hello"]
+
+def test_partial_finished_at_end_of_speech_starts_speculation(monkeypatch):
+    # The second, stable partial only completes after the last chunk
+    (text, response), speech_service, nlp_service = _run(["hello", "hello"], "hello", 2, monkeypatch)
+    
+    assert response == "reply to hello"
+    assert speech_service.nlp_calls_before_final == 1
+    assert nlp_service.calls == ["hello"]
@@ -101,19 +101,60 @@ def run_terminal_interface():
     """Run the terminal interface"""
     terminal_main()
 
+def run_prepare_models():
+    """Convert the speech model into the local model store for offline startup"""
+    from app.core.config import settings
+    from app.services.model_store import prepare_model
+    
+    path = prepare_model(settings.MODEL_NAME)
+    print(f"\nModel prepared at {path}")
+
+def run_asr_workers():
+    """Run one dedicated ASR worker process per configured worker address"""
+    import multiprocessing
+    from app.core.config import settings
+    from app.services.asr_worker import serve
+    
+    if not settings.ASR_WORKER_ADDRESSES:
+        print("\nError: Set ASR_WORKER_ADDRESSES to run ASR workers")
+        sys.exit(1)
+    if not settings.ASR_WORKER_AUTHKEY:
+        print("\nError: Set ASR_WORKER_AUTHKEY to a random secret to run ASR workers")
+        sys.exit(1)
+    
+    workers = [
+        multiprocessing.Process(target=serve, args=(address,), daemon=True)
+        for address in settings.ASR_WORKER_ADDRESSES
+    ]
+    try:
+        for worker in workers:
+            worker.start()
+        print(f"\nRunning {len(workers)} ASR worker(s), press Ctrl+C to stop")
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("\nShutting down ASR workers...")
+        for worker in workers:
+            worker.terminate()
+        sys.exit(0)
+
 def main():
     parser = argparse.ArgumentParser(description="NLP Chatbot Interface")
     parser.add_argument(
         "--mode",
-        choices=["web", "terminal"],
+        choices=["web", "terminal", "prepare-models", "asr-worker"],
         default="web",
-        help="Choose the interface mode (web or terminal)"
+        help="Choose the interface mode (web or terminal), prepare the local model store or run ASR workers"
     )
     
     args = parser.parse_args()
     
     if args.mode == "web":
         run_web_interface()
+    elif args.mode == "prepare-models":
+        run_prepare_models()
+    elif args.mode == "asr-worker":
+        run_asr_workers()
     else:
         run_terminal_interface()
 